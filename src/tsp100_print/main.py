@@ -1,15 +1,56 @@
 import enum
 import logging
-import math
+import selectors
 import socket
+import struct
 import time
 
 import click
-from PIL import Image, ImageEnhance, ImageOps, UnidentifiedImageError
 
 
 SOCKET_BUFFER_SIZE = 1024
 
+# Fixed control sequences from the STAR graphic mode command spec, built once at
+# import time instead of byte-by-byte on every print.
+CMD_INIT_RASTER       = b'\x1b*rR' # Also clears the input buffer if theres any stray data
+CMD_ENTER_RASTER      = b'\x1b*rA'
+CMD_QUIT_RASTER       = b'\x1b*rB'
+CMD_CLEAR_RASTER      = b'\x1b*rC'
+CMD_QUALITY           = b'\x1b*rQ\x02\x00'
+CMD_EOT_NO_CUT        = b'\x1b*rE\x01\x00'
+CMD_NO_LEFT_MARGIN    = b'\x1b*rml\x00\x00'
+CMD_NO_RIGHT_MARGIN   = b'\x1b*rmr\x00\x00'
+CMD_CONTINUOUS_LENGTH = b'\x1b*rP0\x00'
+CMD_FEED_PREFIX       = b'\x1b*rY'
+CMD_SPEED_PREFIX      = b'\x1b\x1er'
+CMD_DENSITY_PREFIX    = b'\x1b\x1ed'
+CMD_START_DOCUMENT    = b'\x1b\x1d\x03\x03\x00\x00'
+CMD_END_DOCUMENT      = b'\x1b\x1d\x03\x04\x00\x00'
+CMD_RESET_ETB         = b'\x1b\x1eE\x00'
+CMD_ETB               = b'\x17'
+
+STATUS_QUERY = b'0' + bytes(50) # '2' will also work
+
+# Invariant parts of the init sequence, concatenated once at import time. Only
+# speed, density and the cut behaviour vary between prints.
+INIT_RASTER_MODE = CMD_INIT_RASTER + CMD_ENTER_RASTER + CMD_QUALITY
+INIT_PAGE_SETUP  = CMD_NO_LEFT_MARGIN + CMD_NO_RIGHT_MARGIN + CMD_CONTINUOUS_LENGTH
+
+BYTES_PER_LINE = 72
+
+LINE_HEADER = b'b' + bytes([BYTES_PER_LINE, 0x00])
+ZERO_ROW = bytes(BYTES_PER_LINE)
+
+
+# Feed paper by whole dot-lines using the printer's native command (ASCII-decimal
+# argument, like the ESC*rP command above), a handful of bytes instead of a
+# 75-byte zero raster line per dot
+def feed_command(dots):
+    if not dots:
+        return b''
+
+    return CMD_FEED_PREFIX + str(dots).encode('ascii') + b'\x00'
+
 log = logging.getLogger(__name__)
 
 
@@ -20,17 +61,14 @@ class PrinterStatus(enum.Flag):
     ETB_EXECUTED  = 0b00000010
 
     def __str__(self):
-        if self is PrinterStatus.COVER_OPEN:
-            return 'Cover is open'
-
-        if self is PrinterStatus.OFFLINE:
-            return 'Printer status is offline'
-
-        if self is PrinterStatus.COMPULSION_SW:
-            return 'Switch is being pressed'
+        return self._MESSAGES.get(self, super().__str__())
 
-        if self is PrinterStatus.ETB_EXECUTED:
-            return 'ETB was executed'
+PrinterStatus._MESSAGES = {
+    PrinterStatus.COVER_OPEN:    'Cover is open',
+    PrinterStatus.OFFLINE:       'Printer status is offline',
+    PrinterStatus.COMPULSION_SW: 'Switch is being pressed',
+    PrinterStatus.ETB_EXECUTED:  'ETB was executed',
+}
 
 class PrinterError(enum.Flag):
     HIGH_TEMPERATURE    = 0b01000000
@@ -38,14 +76,13 @@ class PrinterError(enum.Flag):
     CUTTER_ERROR        = 0b00001000
 
     def __str__(self):
-        if self is PrinterError.HIGH_TEMPERATURE:
-            return 'High temperature error'
+        return self._MESSAGES.get(self, super().__str__())
 
-        if self is PrinterError.UNRECOVERABLE_ERROR:
-            return 'Unrecoverable error'
-
-        if self is PrinterError.CUTTER_ERROR:
-            return 'Cutter error'
+PrinterError._MESSAGES = {
+    PrinterError.HIGH_TEMPERATURE:    'High temperature error',
+    PrinterError.UNRECOVERABLE_ERROR: 'Unrecoverable error',
+    PrinterError.CUTTER_ERROR:        'Cutter error',
+}
 
 class PaperError(enum.Flag):
     NO_PAPER = 0b00001000
@@ -59,6 +96,19 @@ class ErrorList(list):
         return ', '.join(str(s) for s in self)
 
 
+# Maps status byte offsets to the error flags they may carry, so that parsing
+# is a single scan over this table instead of a branch per flag.
+_STATUS_TABLE = (
+    (2, PrinterStatus.COVER_OPEN),
+    (2, PrinterStatus.OFFLINE),
+    (2, PrinterStatus.COMPULSION_SW),
+    (3, PrinterError.HIGH_TEMPERATURE),
+    (3, PrinterError.UNRECOVERABLE_ERROR),
+    (3, PrinterError.CUTTER_ERROR),
+    (5, PaperError.NO_PAPER),
+)
+
+
 class Status:
     def __init__(self):
         self.etb_executed = False
@@ -69,8 +119,6 @@ class Status:
         return f'ETB Executed: {self.etb_executed}, ETB Counter: {self.etb_counter}, ErrorList: {self.errors}'
 
     def parse(self, status):
-        self.errors = ErrorList()
-
         b1 = status[0]
         _status_length = ((b1 >> 2) & 0b1000) + ((b1 >> 1) & 0b111)
 
@@ -81,40 +129,61 @@ class Status:
         b2 = status[1]
         _status_version = ((b2 >> 2) & 0b11000) + ((b2 >> 1) & 0b111)
 
+        self.errors = ErrorList(flag for index, flag in _STATUS_TABLE if status[index] & flag.value)
 
-        b3 = status[2]
-        if b3 & PrinterStatus.COVER_OPEN.value:
-            self.errors.append(PrinterStatus.COVER_OPEN)
+        self.etb_executed = bool(status[2] & PrinterStatus.ETB_EXECUTED.value)
 
-        if b3 & PrinterStatus.OFFLINE.value:
-            self.errors.append(PrinterStatus.OFFLINE)
+        b8 = status[7]
+        self.etb_counter = ((b8 >> 2) & 0b11000) + ((b8 >> 1) & 0b111)
 
-        if b3 & PrinterStatus.COMPULSION_SW.value:
-            self.errors.append(PrinterStatus.COMPULSION_SW)
 
-        self.etb_executed = False
-        if b3 & PrinterStatus.ETB_EXECUTED.value:
-            self.etb_executed = True
+# There is no portable stdlib API for enumerating broadcast addresses, so on POSIX
+# we ask the kernel directly with the SIOCGIFBRDADDR ioctl, for each known interface.
+def broadcast_addresses():
+    addresses = []
 
+    try:
+        import fcntl
 
-        b4 = status[3]
-        if b4 & PrinterError.HIGH_TEMPERATURE.value:
-            self.errors.append(PrinterError.HIGH_TEMPERATURE)
+        SIOCGIFBRDADDR = 0x8919
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for _index, name in socket.if_nameindex():
+                try:
+                    ifreq = struct.pack('256s', name.encode()[:15])
+                    response = fcntl.ioctl(sock.fileno(), SIOCGIFBRDADDR, ifreq)
+                    address = socket.inet_ntoa(response[20:24])
+                except OSError:
+                    continue
 
-        if b4 & PrinterError.UNRECOVERABLE_ERROR.value:
-            self.errors.append(PrinterError.UNRECOVERABLE_ERROR)
+                if address != '0.0.0.0':
+                    addresses.append(address)
+    except ImportError:
+        pass
 
-        if b4 & PrinterError.CUTTER_ERROR.value:
-            self.errors.append(PrinterError.CUTTER_ERROR)
+    # Fall back to the limited broadcast address, which the OS may route out a
+    # single interface only.
+    return addresses or ['255.255.255.255']
 
 
-        b6 = status[5]
-        if b6 & PaperError.NO_PAPER.value:
-            self.errors.append(PaperError.NO_PAPER)
+# writev(2) caps how many buffers a single sendmsg call may carry (IOV_MAX,
+# 1024 on Linux), stay comfortably below it
+SENDMSG_MAX_BUFFERS = 512
 
+# Hand the kernel a list of buffers with sendmsg (scatter/gather I/O) instead of
+# concatenating them into one large intermediate payload first. Falls back to a
+# plain sendall on platforms without sendmsg.
+def send_buffers(connection, buffers):
+    if not hasattr(connection, 'sendmsg'):
+        connection.sendall(b''.join(buffers))
+        return
 
-        b8 = status[7]
-        self.etb_counter = ((b8 >> 2) & 0b11000) + ((b8 >> 1) & 0b111)
+    for start in range(0, len(buffers), SENDMSG_MAX_BUFFERS):
+        batch = buffers[start:start + SENDMSG_MAX_BUFFERS]
+        sent = connection.sendmsg(batch)
+
+        # Partial send, flush the remainder the simple way
+        if sent < sum(len(buffer) for buffer in batch):
+            connection.sendall(b''.join(batch)[sent:])
 
 
 # This was discovered by capturing network traffic from the futurePRNT software.
@@ -124,71 +193,160 @@ class Status:
 #
 # This is apparently called SDP, or "Star Discovery Protocol", and it's briefly mentioned in this
 # document: http://www.starasia.com/Download/Others/UsersManual_IFBD_HE0708BE07_EN.pdf
-def discover_printers():
+def discover_printers(timeout=1):
     msg = b'STR_BCAST' + bytes([0x00] * 7) + b'RQ1.0.0' + bytes([0x00, 0x00, 0x1c, 0x64, 0x31])
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    sock.settimeout(1)
+    sock.setblocking(False)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
-    # NOTE: Ideally we should send to the broadcast address of each connected network instead.
-    sock.sendto(msg, ("255.255.255.255", 22222))
+    # Broadcast on every connected network, so printers on all of them can hear us
+    for address in broadcast_addresses():
+        try:
+            sock.sendto(msg, (address, 22222))
+        except OSError as e:
+            log.debug('Could not broadcast to %s: %s', address, e)
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+
+    # Drain every reply that arrives within the deadline, so multi-printer LANs
+    # are fully enumerated. Once the first reply is in, only linger briefly for
+    # stragglers instead of sitting out the whole timeout.
+    printers = []
+    deadline = time.monotonic() + timeout
 
     try:
-        _data, (sender, _port) = sock.recvfrom(SOCKET_BUFFER_SIZE)
+        while True:
+            remaining = deadline - time.monotonic()
+            if printers:
+                remaining = min(remaining, 0.1)
 
-        # Just grab the first available printer
-        return sender
+            if remaining <= 0 or not selector.select(remaining):
+                break
 
-    except TimeoutError:
-        return None
+            _data, (sender, _port) = sock.recvfrom(SOCKET_BUFFER_SIZE)
+            if sender not in printers:
+                printers.append(sender)
+
+        return printers
 
     finally:
+        selector.close()
         sock.close()
 
 
 # This was discovered by capturing network traffic from the futurePRNT software.
 # NOTE: The status bytestring received from my printer is duplicated for some reason.
 # The protocol is briefly mentioned here: http://www.starasia.com/Download/Others/UsersManual_IFBD_HE0708BE07_EN.pdf
-def get_printer_status(host):
-    sock = socket.create_connection((host, 9101), timeout=1)
+# Reusable receive buffer for status queries; recv_into avoids allocating a
+# fresh bytes object for every poll in the print-wait loop
+_STATUS_BUFFER = bytearray(SOCKET_BUFFER_SIZE)
+_STATUS_VIEW = memoryview(_STATUS_BUFFER)
+
+def get_printer_status(host, connection=None):
+    # Callers that poll repeatedly can pass a pre-opened connection to the status
+    # port, to avoid a full TCP handshake and teardown per query.
+    sock = connection
+    if sock is None:
+        sock = socket.create_connection((host, 9101), timeout=1)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     sock.settimeout(1)
-    sock.sendall(b'0' + bytes([0x00] * 50)) # '2' will also work
-    response = sock.recv(SOCKET_BUFFER_SIZE)
+
+    try:
+        sock.sendall(STATUS_QUERY)
+        received = sock.recv_into(_STATUS_BUFFER)
+    finally:
+        if connection is None:
+            sock.close()
 
     status = Status()
-    status.parse(response)
+    status.parse(_STATUS_VIEW[:received])
 
     return status
 
 
+# The printer pushes an unsolicited ASB (Automatic Status Back) message on the
+# data connection whenever its state changes, e.g. when an ETB is executed. Wait
+# for one with a select instead of sleeping a fixed interval; returns None if
+# nothing arrived within the timeout, raises ConnectionError if the printer
+# closed the connection.
+def read_asb_status(connection, timeout=0.1):
+    selector = selectors.DefaultSelector()
+    selector.register(connection, selectors.EVENT_READ)
+
+    try:
+        if selector.select(timeout):
+            asb = connection.recv(SOCKET_BUFFER_SIZE)
+            log.debug('ASB: %s', repr([hex(x) for x in asb]))
+
+            # A closed socket selects as readable forever, so the caller must
+            # stop waiting on it or this degenerates into a busy-loop
+            if not asb:
+                raise ConnectionError('Printer closed the data connection')
+
+            # An ASB is at least 8 bytes; treat a short read (a push split
+            # across TCP segments, or truncated) like no ASB at all and let the
+            # caller fall back to the status port
+            if len(asb) >= 8:
+                status = Status()
+                status.parse(asb)
+                return status
+
+        return None
+    finally:
+        selector.close()
+
+
 def process_image(image_file, dither, resize_width, sharpness):
+    # Pillow is by far the heaviest import; pull it in only when an image is
+    # actually processed, so --help and the early error paths stay snappy
+    from PIL import Image, ImageEnhance, ImageOps, UnidentifiedImageError
+
     try:
         image = Image.open(image_file)
     except UnidentifiedImageError as e:
         raise click.ClickException(f'Could not open {image_file.name} as an image, unknown format') from e
 
+    # Do the resize/sharpen work in grayscale and binarize last: resizing a 1-bit
+    # image is low quality (and gets promoted internally anyway), and dithering
+    # the post-resize image touches far fewer pixels. This also makes the
+    # histogram below a well-defined 256 bins regardless of source mode.
+    image = image.convert('L')
+
+    dither = dither.upper()
+
+    # One cheap histogram pass tells us whether the source is already bilevel,
+    # which steers both the warning and the dithering decision below. All pixels
+    # landing in the first and last bins means there are no in-between levels;
+    # sum() runs in C, unlike any() over the bin list.
     histogram = image.histogram()
-    if any(histogram[1:-1]):
+    bilevel = histogram[0] + histogram[-1] == sum(histogram)
+
+    if not bilevel and dither == 'NONE':
         log.warning('More than 2 levels (black/white), data will be lost via thresholding/dithering')
 
+    # There is no error to diffuse in a bilevel image, skip the much more
+    # expensive Floyd-Steinberg pass
+    if bilevel and dither == 'FLOYDSTEINBERG':
+        log.info('Image is already bilevel, skipping dithering')
+        dither = 'NONE'
+
 
     if resize_width:
         resize_height = resize_width * image.height // image.width
         log.info('Resizing image to width / height: %d / %d', resize_width, resize_height)
         image = image.resize((resize_width, resize_height))
 
-    image = ImageEnhance.Sharpness(image)
-    image = image.enhance(sharpness)
-
-    image = image.convert("1", dither=getattr(Image.Dither, dither.upper()))
-    image = ImageOps.invert(image)
-
-    # Crop the image if needed, try to be minimally destructive by only cropping "empty" image data
+    # Crop oversized images down to the printable width while still in grayscale,
+    # so that sharpening and especially Floyd-Steinberg dithering never touch
+    # pixels that could not be printed anyway.
+    # Try to be minimally destructive by only cropping "empty" image data.
     if image.width > 576:
         log.info('Image is wider than 576 pixels, cropping will occur')
 
-        (left, _upper, right, _lower) = image.getbbox() or (0, 0, image.width, image.height)
+        # Content is dark on light here, so find it on the inverted image
+        (left, _upper, right, _lower) = ImageOps.invert(image).getbbox() or (0, 0, image.width, image.height)
         cropped_width = right - left
 
         if cropped_width > 576:
@@ -202,12 +360,38 @@ def process_image(image_file, dither, resize_width, sharpness):
                 log.info('Cropping empty image content only, no data loss')
                 image = image.crop((0, 0, right, image.height))
 
-    return image
+    image = ImageEnhance.Sharpness(image)
+    image = image.enhance(sharpness)
+
+    image = image.convert("1", dither=getattr(Image.Dither, dither))
+    image = ImageOps.invert(image)
+
+    # Bounding box of the printable (white after inversion) content, computed once in C.
+    # None means the image is blank; the trailing-line crop and the caller's blank
+    # check both use it.
+    bbox = image.getbbox()
+
+    # Trailing blank lines would only be transmitted as zero raster data; drop
+    # them and let the bottom margin provide the paper feed instead
+    if bbox and bbox[3] < image.height:
+        log.info('Dropping %d trailing blank lines', image.height - bbox[3])
+        image = image.crop((0, 0, image.width, bbox[3]))
+
+    # Pad the image to the full 576-pixel print width, so that tobytes() always
+    # yields exactly 72 bytes per line and the send path needs no per-line width
+    # arithmetic.
+    if image.width < 576:
+        canvas = Image.new('1', (576, image.height), 0)
+        canvas.paste(image, (0, 0))
+        image = canvas
+
+    return image, bbox
 
 
 @click.command(context_settings={'show_default': True})
 @click.option('--cut/--no-cut', default=True, help='Whether or not to cut receipt after printing')
 @click.option('-d', '--density', default=3, type=click.IntRange(0, 6), help='0 = Highest density, 6 = Lowest density')
+@click.option('--discover-timeout', default=0.5, help='Maximum time in seconds to wait for printers to respond during autodetection')
 @click.option('--dither', default='NONE', type=click.Choice(['NONE', 'FLOYDSTEINBERG'], case_sensitive=False))
 @click.option('--log-level', type=click.Choice(['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG'], case_sensitive=False), default='WARNING')
 @click.option('--margin-top', default=0)
@@ -218,7 +402,7 @@ def process_image(image_file, dither, resize_width, sharpness):
 @click.option('--sharpness', default=0.0, help='Sharpen the image, higher numbers gives a sharper image')
 @click.argument('printer', nargs=-1)
 @click.argument('image_file', type=click.File('rb'))
-def print_image(printer, image_file, cut, density, dither, log_level, margin_top, margin_bottom, print_timeout, resize_width, speed, sharpness):
+def print_image(printer, image_file, cut, density, discover_timeout, dither, log_level, margin_top, margin_bottom, print_timeout, resize_width, speed, sharpness):
     '''
     This is a small utility for sending raster images to Star Micronics TSP100 / TSP143 receipt printers.
 
@@ -231,18 +415,24 @@ def print_image(printer, image_file, cut, density, dither, log_level, margin_top
     if len(printer) > 1:
         raise click.UsageError('Multiple printers specified, please specify a single printer')
 
-    image = process_image(image_file, dither, resize_width, sharpness)
-    raw_bytes = image.tobytes()
+    image, bbox = process_image(image_file, dither, resize_width, sharpness)
 
-    if not any(raw_bytes):
+    if bbox is None:
         log.critical('Image is blank, refusing to print')
         raise click.ClickException('Image contains no printable data')
 
+    raw_bytes = image.tobytes()
+
     if not printer:
-        host = discover_printers()
+        printers = discover_printers(discover_timeout)
 
-        if not host:
+        if not printers:
             raise click.ClickException('Could not autodetect printer, and no printer was given')
+
+        if len(printers) > 1:
+            log.warning('Multiple printers discovered (%s), using the first one', ', '.join(printers))
+
+        host = printers[0]
     else:
         host = printer[0]
 
@@ -254,6 +444,10 @@ def print_image(printer, image_file, cut, density, dither, log_level, margin_top
     except OSError as e:
         raise click.ClickException(f'Could not connect to {host}: {e}') from e
 
+    # Disable Nagle's algorithm, the small control commands below should go out
+    # immediately instead of waiting for ACKs on earlier segments.
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
     printer_status = Status()
 
     # Read printer status
@@ -265,24 +459,27 @@ def print_image(printer, image_file, cut, density, dither, log_level, margin_top
 
     # This is where we must clear all previous failures, if any
     # We might have to send junk data first, if the printer is still waiting for image data.
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'B')])) # Quit raster mode
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'C')])) # Clear raster data
-    connection.sendall(bytes([0x1b, 0x1d, 0x03, 4, 0, 0])) # End document
+    # Quit raster mode, clear raster data, end document
+    connection.sendall(CMD_QUIT_RASTER + CMD_CLEAR_RASTER + CMD_END_DOCUMENT)
     # We cannot proceed unless everything has been cleared and reinitialized by now
 
-    # Reset ETB counter
-    connection.sendall(bytes([0x1b, 0x1e, 0x45, 0]))
-    time.sleep(0.1)
-    printer_status = get_printer_status(host)
+    # One persistent connection to the status port for all polls below, instead of
+    # a TCP handshake and teardown per query
+    status_connection = socket.create_connection((host, 9101), timeout=1)
+    status_connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # Reset ETB counter, then wait for the ASB push instead of sleeping blindly.
+    # Fall back to the status port if no ASB arrives in time.
+    connection.sendall(CMD_RESET_ETB)
+    printer_status = read_asb_status(connection) or get_printer_status(host, status_connection)
     if printer_status.etb_counter != 0:
         raise click.ClickException('Could not reset ETB counter')
     if printer_status.errors:
         raise click.ClickException(f'Printer errors: {printer_status.errors}')
 
     # Increase ETB
-    connection.sendall(bytes([0x17]))
-    time.sleep(0.1)
-    new_printer_status = get_printer_status(host)
+    connection.sendall(CMD_ETB)
+    new_printer_status = read_asb_status(connection) or get_printer_status(host, status_connection)
     if new_printer_status.etb_counter <= printer_status.etb_counter:
         raise click.ClickException('ETB counter did not increase')
     if new_printer_status.errors:
@@ -291,56 +488,88 @@ def print_image(printer, image_file, cut, density, dither, log_level, margin_top
     # Initialize printer
 
     # Start Document
-    connection.sendall(bytes([0x1b, 0x1d, 0x03, 3, 0, 0]))
+    connection.sendall(CMD_START_DOCUMENT)
 
-    connection.sendall(bytes([0x1b, 0x1e, 0x72, speed])) # Speed
-    connection.sendall(bytes([0x1b, 0x1e, 0x64, density])) # Set print density
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'R')])) # Init raster mode, this will clear the input buffer if theres any stray data
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'A')])) # Enter raster mode
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'Q'), 2, 0x00])) # Set raster print quality
+    init = CMD_SPEED_PREFIX + bytes([speed]) + CMD_DENSITY_PREFIX + bytes([density]) + INIT_RASTER_MODE
 
     if not cut:
-        connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'E'), 1, 0x00])) # End of Transmission cut behaviour
+        init += CMD_EOT_NO_CUT # End of Transmission cut behaviour
+
+    init += INIT_PAGE_SETUP
+
+    connection.sendall(init)
 
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'm'), ord(b'l'), 0, 0x00])) # No left margin
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'm'), ord(b'r'), 0, 0x00])) # No right margin
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'P'), ord(b'0'), 0x00])) # Set raster length to continuous
+    # Assemble the entire raster payload (margins + image lines) as a list of
+    # buffers, with the image rows as zero-copy views into raw_bytes, and let the
+    # kernel gather them into the TCP stream.
+    raw_view = memoryview(raw_bytes)
 
-    BYTES_PER_LINE = 72
+    # Margins are 8 dots per millimeter
+    chunks = [feed_command(8 * margin_top)]
 
-    # Send top margin, 8 dots per millimeter
-    for _line in range(8 * margin_top):
-        connection.sendall(bytes([ord(b'b'), BYTES_PER_LINE, 0x00]))
-        connection.sendall(bytes([0x00] * BYTES_PER_LINE))
+    # Collapse runs of blank lines into a single feed command, instead of
+    # transmitting 75 bytes of zero raster data per empty line. The printer
+    # cannot repeat non-blank lines, so those are always sent in full.
+    blank_run = 0
+    for line in range(image.height):
+        row = raw_view[line * BYTES_PER_LINE:(line + 1) * BYTES_PER_LINE]
 
-    # Send image
-    index = 0
-    for _line in range(image.height):
-        line_length = min(math.ceil(image.width / 8), BYTES_PER_LINE)
-        connection.sendall(bytes([ord(b'b'), line_length, 0x00]))
+        if row == ZERO_ROW:
+            blank_run += 1
+            continue
 
-        for _row in range(line_length):
-            connection.sendall(bytes([raw_bytes[index]]))
-            index += 1
+        if blank_run:
+            chunks.append(feed_command(blank_run))
+            blank_run = 0
 
-    # Send bottom margin, 8 dots per millimeter
-    for _line in range(8 * margin_bottom):
-        connection.sendall(bytes([ord(b'b'), BYTES_PER_LINE, 0x00]))
-        connection.sendall(bytes([0x00] * BYTES_PER_LINE))
+        chunks.append(LINE_HEADER)
+        chunks.append(row)
 
-    connection.sendall(bytes([0x1b, ord(b'*'), ord(b'r'), ord(b'B')])) # Quit raster mode
+    # Any blank run left at the end folds into the bottom margin feed
+    chunks.append(feed_command(blank_run + 8 * margin_bottom))
+
+    # Ask for a send buffer that can take the whole job at once, so the gathered
+    # send below doesn't have to drip through the default-sized buffer
+    payload_size = sum(len(chunk) for chunk in chunks)
+    connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, max(256 * 1024, payload_size))
+
+    send_buffers(connection, chunks)
+
+    connection.sendall(CMD_QUIT_RASTER)
 
     # Increase ETB
-    connection.sendall(bytes([0x17]))
+    connection.sendall(CMD_ETB)
 
     # End document
-    connection.sendall(bytes([0x1b, 0x1d, 0x03, 4, 0, 0]))
+    connection.sendall(CMD_END_DOCUMENT)
+
+    # Wait for print to finish by waiting for the ETB counter to increase.
+    # Poll aggressively at first so that small prints return quickly, then back
+    # off so that long prints don't hammer the status port.
+    delay = 0.02
+    deadline = time.monotonic() + print_timeout
+
+    asb_alive = True
+
+    while True:
+        # The printer pushes an ASB on the data connection when the ETB
+        # executes; waiting for that doubles as the poll delay, and we only
+        # fall back to querying the status port when nothing was pushed. Once
+        # the printer drops the connection (it may do so after the cut), a
+        # plain sleep takes over the pacing.
+        new_printer_status = None
+
+        if asb_alive:
+            try:
+                new_printer_status = read_asb_status(connection, delay)
+            except ConnectionError:
+                log.debug('Data connection closed, switching to status polling')
+                asb_alive = False
+        else:
+            time.sleep(delay)
 
-    # Wait for print to finish by waiting for the ETB counter to increase
-    iteration_delay = 0.1
-    for _iteration in range(int(print_timeout / iteration_delay)):
-        time.sleep(iteration_delay)
-        new_printer_status = get_printer_status(host)
+        if new_printer_status is None:
+            new_printer_status = get_printer_status(host, status_connection)
 
         if new_printer_status.errors:
             raise click.ClickException(f'Printer errors: {new_printer_status.errors}')
@@ -348,10 +577,18 @@ def print_image(printer, image_file, cut, density, dither, log_level, margin_top
         if new_printer_status.etb_counter > printer_status.etb_counter:
             log.debug("ETB increased from %d to %d, print finished!", printer_status.etb_counter, new_printer_status.etb_counter)
             break
-    else:
-        raise click.ClickException('Print failed, check printer')
 
-    # Reset ETB counter
-    connection.sendall(bytes([0x1b, 0x1e, 0x45, 0]))
+        if time.monotonic() >= deadline:
+            raise click.ClickException('Print failed, check printer')
+
+        delay = min(delay * 1.5, 0.2)
+
+    # Reset ETB counter. The printer may already have dropped the connection
+    # after the cut, which is fine since the next print resets it on startup.
+    try:
+        connection.sendall(CMD_RESET_ETB)
+    except OSError:
+        log.debug('Connection already closed, skipping ETB counter reset')
 
+    status_connection.close()
     connection.close()